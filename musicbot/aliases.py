@@ -1,61 +1,82 @@
 import logging
+import mmap
+import os
 import shutil
-import json
 from pathlib import Path
 
 from .exceptions import HelpfulError
+from .json import loads
 
 log = logging.getLogger(__name__)
 
+# Aliases files at least this big are memory-mapped instead of read into a
+# bytes object before being parsed
+MMAP_THRESHOLD = 64 * 1024
+
 
 class Aliases:
+    __slots__ = ['aliases_file', 'aliases']
+
     def __init__(self, aliases_file):
         self.aliases_file = Path(aliases_file)
-        self.aliases_seed = AliasesDefault.aliases_seed
-        self.aliases = AliasesDefault.aliases
-
-        # find aliases file
-        if not self.aliases_file.is_file():
-            example_aliases = Path('config/example_aliases.json')
-            if example_aliases.is_file():
-                shutil.copy(str(example_aliases), str(self.aliases_file))
-                log.warning('Aliases file not found, copying example_aliases.json')
-            else:
-                raise HelpfulError(
-                    "Your aliases files are missing. Neither aliases.json nor example_aliases.json were found.",
-                    "Grab the files back from the archive or remake them yourself and copy paste the content "
-                    "from the repo. Stop removing important files!"
-                )
-
-        # parse json
-        with self.aliases_file.open() as f:
-            try:
-                self.aliases_seed = json.load(f)
-            except:
-                raise HelpfulError(
-                    "Failed to parse aliases file.",
-                    "Ensure your {} is a valid json file and restart the bot.".format(str(self.aliases_file))
-                )
-
-        # construct
-        for cmd, aliases in self.aliases_seed.items():
-            if not isinstance(cmd, str) or not isinstance(aliases, list):
-                raise HelpfulError(
-                    "Failed to parse aliases file.",
-                    "See documents and config {} properly!".format(str(self.aliases_file))
-                )
-            self.aliases.update({alias.lower(): cmd.lower() for alias in aliases})
-    
+        self.aliases = self._construct(self._parse_json())
+
+    def _open_aliases_file(self):
+        try:
+            return self.aliases_file.open('rb')
+        except FileNotFoundError:
+            pass
+
+        example_file = Path('config/example_aliases.json')
+        if not example_file.is_file():
+            raise HelpfulError(
+                "Your aliases files are missing. Neither aliases.json nor example_aliases.json were found.",
+                "Grab the files back from the archive or remake them yourself and copy paste the content "
+                "from the repo. Stop removing important files!"
+            )
+        self.aliases_file.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(str(example_file), str(self.aliases_file))
+        log.warning('Aliases file not found, copying example_aliases.json')
+        return self.aliases_file.open('rb')
+
+    def _read_json(self):
+        with self._open_aliases_file() as file:
+            if os.fstat(file.fileno()).st_size < MMAP_THRESHOLD:
+                return loads(file.read())
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, \
+                 memoryview(mapped) as view:
+                return loads(view)
+
+    def _parse_json(self):
+        try:
+            return self._read_json()
+        except ValueError:
+            raise HelpfulError(
+                "Failed to parse aliases file.",
+                "Ensure your {} is a valid json file and restart the bot.".format(str(self.aliases_file))
+            )
+
+    def _construct(self, aliases_seed):
+        aliases = {}
+        try:
+            for cmd, cmd_aliases in aliases_seed.items():
+                if not isinstance(cmd_aliases, list):
+                    raise TypeError('aliases of {} must be a list'.format(cmd))
+                aliases.update(dict.fromkeys(map(str.lower, cmd_aliases), cmd.lower()))
+        except (AttributeError, TypeError):
+            raise HelpfulError(
+                "Failed to parse aliases file.",
+                "See documents and config {} properly!".format(str(self.aliases_file))
+            )
+        return aliases
+
     def get(self, arg):
         """
         Return cmd name (string) that given arg points.
         If arg is not registered as alias, empty string will be returned.
         supposed to be called from bot.on_message
         """
-        ret = self.aliases.get(arg)
-        return ret if ret else ''
+        return self.aliases.get(arg, '')
             
 class AliasesDefault:
     aliases_file = 'config/aliases.json'
-    aliases_seed = {}
-    aliases = {}
@@ -1,5 +1,7 @@
 '''Module containing logic and class for the main interface of the MusicBot'''
+from __future__ import annotations
 from collections import defaultdict
+from typing import TYPE_CHECKING
 import asyncio
 import logging
 import sys
@@ -10,23 +12,55 @@ import colorlog
 
 from discord import Intents
 from discord.ext.commands import Bot, CommandError, CommandInvokeError, Context
-from dislash import InteractionClient
 
 from .aliases import Aliases, AliasesDefault
 from .config import Config, ConfigDefaults
 from .constants import VERSION as BOTVERSION
-from .downloader import Downloader
+from .constructs import ServerState
 from .exceptions import MusicbotException, TerminateSignal
-from .json import Json
+from .json import Json, dumps
 from .opus_loader import load_opus_lib
 from .permissions import Permissions, PermissionsDefaults
 from .utils import load_file
-from .cogs import COGS
+
+if TYPE_CHECKING:
+    from dislash import InteractionClient
 
 load_opus_lib()
 
 log = logging.getLogger(__name__)
 
+_USER_AGENT_SUFFIX = f' MusicBot/{BOTVERSION}'
+
+_LOG_FORMATTER = colorlog.LevelFormatter(
+    fmt = {
+        'DEBUG': '{log_color}[{levelname}:{module}] {message}',
+        'INFO': '{log_color}{message}',
+        'WARNING': '{log_color}{levelname}: {message}',
+        'ERROR': '{log_color}[{levelname}:{module}] {message}',
+        'CRITICAL': '{log_color}[{levelname}:{module}] {message}',
+
+        'EVERYTHING': '{log_color}[{levelname}:{module}] {message}',
+        'NOISY': '{log_color}[{levelname}:{module}] {message}',
+        'VOICEDEBUG': '{log_color}[{levelname}:{module}][{relativeCreated:.9f}] {message}',
+        'FFMPEG': '{log_color}[{levelname}:{module}][{relativeCreated:.9f}] {message}'
+    },
+    log_colors = {
+        'DEBUG':    'cyan',
+        'INFO':     'white',
+        'WARNING':  'yellow',
+        'ERROR':    'red',
+        'CRITICAL': 'bold_red',
+
+        'EVERYTHING': 'white',
+        'NOISY':      'white',
+        'FFMPEG':     'bold_purple',
+        'VOICEDEBUG': 'purple',
+    },
+    style = '{',
+    datefmt = ''
+)
+
 class MusicBot(Bot):
     '''Main class for the music bot'''
 
@@ -52,29 +86,42 @@ class MusicBot(Bot):
         if self.config.usealias:
             self.aliases = Aliases(aliases_file)
 
-        self.blacklist = set(load_file(self.config.blacklist_file))
+        self.blacklist = frozenset(load_file(self.config.blacklist_file))
         self.autoplaylist = load_file(self.config.auto_playlist_file)
 
-        self.aiolocks = defaultdict(asyncio.Lock)
+        # The downloader, the cogs and the slash command client pull in
+        # youtube_dl and dislash, so they are only imported once the config
+        # files have been loaded and validated.
+        from dislash import InteractionClient
+        from .cogs import COGS
+        from .downloader import Downloader
+
+        self.aiolocks = {}
         self.downloader = Downloader(download_folder='audio_cache')
 
-        # TODO: Do these properly
-        ssd_defaults = {
-            'last_np_msg': None,
-            'auto_paused': False,
-            'availability_paused': False
-        }
-        self.server_specific_data = defaultdict(ssd_defaults.copy)
+        self.server_specific_data = defaultdict(ServerState)
 
-        self.aiosession = aiohttp.ClientSession(loop=self.loop)
-        self.http.user_agent += ' MusicBot/%s' % BOTVERSION
+        self.aiosession = aiohttp.ClientSession(
+            loop=self.loop,
+            json_serialize=dumps,
+            connector=aiohttp.TCPConnector(loop=self.loop, ttl_dns_cache=300)
+        )
+        self.http.user_agent += _USER_AGENT_SUFFIX
 
         for cog_class in COGS:
             self.add_cog(cog_class(self))
+        self.messenger_cog = self.get_cog('MessengerCog')
 
         interactive_client = InteractionClient(self, test_guilds=list(self.config.servers))
         self._setup_my_listeners(interactive_client)
 
+    def get_lock(self, key) -> asyncio.Lock:
+        '''Returns the lock stored under key, creating it on first use'''
+        lock = self.aiolocks.get(key)
+        if lock is None:
+            lock = self.aiolocks[key] = asyncio.Lock()
+        return lock
+
     def _setup_my_listeners(self, interactive_client: InteractionClient):
         interactive_client.events['on_slash_command_error'] = self.on_command_error
         interactive_client.events['slash_command_error'] = self.on_command_error
@@ -89,34 +136,7 @@ class MusicBot(Bot):
             return
 
         shandler = logging.StreamHandler(stream=sys.stdout)
-        shandler.setFormatter(colorlog.LevelFormatter(
-            fmt = {
-                'DEBUG': '{log_color}[{levelname}:{module}] {message}',
-                'INFO': '{log_color}{message}',
-                'WARNING': '{log_color}{levelname}: {message}',
-                'ERROR': '{log_color}[{levelname}:{module}] {message}',
-                'CRITICAL': '{log_color}[{levelname}:{module}] {message}',
-
-                'EVERYTHING': '{log_color}[{levelname}:{module}] {message}',
-                'NOISY': '{log_color}[{levelname}:{module}] {message}',
-                'VOICEDEBUG': '{log_color}[{levelname}:{module}][{relativeCreated:.9f}] {message}',
-                'FFMPEG': '{log_color}[{levelname}:{module}][{relativeCreated:.9f}] {message}'
-            },
-            log_colors = {
-                'DEBUG':    'cyan',
-                'INFO':     'white',
-                'WARNING':  'yellow',
-                'ERROR':    'red',
-                'CRITICAL': 'bold_red',
-
-                'EVERYTHING': 'white',
-                'NOISY':      'white',
-                'FFMPEG':     'bold_purple',
-                'VOICEDEBUG': 'purple',
-        },
-            style = '{',
-            datefmt = ''
-        ))
+        shandler.setFormatter(_LOG_FORMATTER)
         shandler.setLevel(self.config.debug_level)
         logging.getLogger(__package__).addHandler(shandler)
 
@@ -131,7 +151,7 @@ class MusicBot(Bot):
             dlogger.addHandler(dhandler)
 
     async def on_command_error(self, context: Context, exception: CommandError):
-        messenger_cog = self.get_cog('MessengerCog')
+        messenger_cog = self.messenger_cog
         if messenger_cog is None:
             raise ValueError('MessengerCog is missing')
         if isinstance(exception, CommandInvokeError):
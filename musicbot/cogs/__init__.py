@@ -1,5 +1,5 @@
 '''Module containing all the Cogs for music bot'''
-from typing import List
+from typing import Tuple, Type
 
 from .connection_manager import ConnectionManagerCog
 from .custom_cog import CustomCog as Cog
@@ -10,7 +10,7 @@ from .play import PlayCog
 from .player import PlayerCog
 from .special_play import SpecialPlayCog
 
-COGS: List[Cog] = [
+COGS: Tuple[Type[Cog], ...] = (
     ConnectionManagerCog,
     MessengerCog,
     MusicManagerCog,
@@ -18,4 +18,4 @@ COGS: List[Cog] = [
     PlayCog,
     PlayerCog,
     SpecialPlayCog,
-]
+)
@@ -1,6 +1,7 @@
 '''Custom Cog module'''
 from __future__ import annotations
 from dataclasses import dataclass
+from functools import cached_property
 from typing import TYPE_CHECKING
 
 from discord import Guild
@@ -11,6 +12,8 @@ from ..player import MusicPlayer
 if TYPE_CHECKING:
     from ..bot import MusicBot
     from .messenger import MessengerCog
+    from .music_manager import MusicManagerCog
+    from .play import PlayCog
     from .player import PlayerCog
 
 @dataclass
@@ -21,36 +24,43 @@ class CustomCog(Cog):
     '''
     bot: MusicBot
 
+    # Strings resolved once when the cog is created, as (attribute, key, default)
+    _STRINGS = ()
+
+    def __post_init__(self):
+        for attr, key, default in self._STRINGS:
+            setattr(self, attr, self.str.get(key, default))
+
     @property
     def voice_clients(self):
         '''Voice clients where the bot is allowed'''
         return self.bot.voice_clients
 
-    @property
+    @cached_property
     def str(self):
         return self.bot.str
 
-    @property
+    @cached_property
     def config(self):
         return self.bot.config
 
-    @property
-    def aiolocks(self):
-        return self.bot.aiolocks
+    def get_lock(self, key):
+        '''Returns the bot lock stored under key'''
+        return self.bot.get_lock(key)
 
-    @property
+    @cached_property
     def permissions(self):
         return self.bot.permissions
 
-    @property
+    @cached_property
     def server_specific_data(self):
         return self.bot.server_specific_data
 
-    @property
+    @cached_property
     def autoplaylist(self):
         return self.bot.autoplaylist
 
-    @property
+    @cached_property
     def downloader(self):
         return self.bot.downloader
 
@@ -61,11 +71,10 @@ class CustomCog(Cog):
         '''
         if not self.config.delete_nowplaying:
             return
-        last_np_msg = self.server_specific_data[guild]['last_np_msg']
-        if last_np_msg is None:
-            return
-        await self.safe_delete_message(last_np_msg)
-        self.server_specific_data[guild]['last_np_msg'] = None
+        state = self.server_specific_data[guild]
+        last_np_msg, state.last_np_msg = state.last_np_msg, None
+        if last_np_msg is not None:
+            await self.safe_delete_message(last_np_msg)
 
     def _get_cog(self, cog_name: str):
         cog = self.bot.get_cog(cog_name)
@@ -73,19 +82,33 @@ class CustomCog(Cog):
             raise ValueError(f'{cog_name} is missing')
         return cog
 
-    def _get_messenger_cog(self) -> MessengerCog:
+    @cached_property
+    def messenger_cog(self) -> MessengerCog:
+        '''MessengerCog of the bot, resolved on first access'''
         return self._get_cog('MessengerCog')
 
-    def _get_player_cog(self) -> PlayerCog:
+    @cached_property
+    def player_cog(self) -> PlayerCog:
+        '''PlayerCog of the bot, resolved on first access'''
         return self._get_cog('PlayerCog')
 
+    @cached_property
+    def play_cog(self) -> PlayCog:
+        '''PlayCog of the bot, resolved on first access'''
+        return self._get_cog('PlayCog')
+
+    @cached_property
+    def music_manager_cog(self) -> MusicManagerCog:
+        '''MusicManagerCog of the bot, resolved on first access'''
+        return self._get_cog('MusicManagerCog')
+
     async def safe_send_message(self, dest, content, **kwargs):
         '''Send messages to the specified destination'''
-        return await self._get_messenger_cog().safe_send_message(dest, content, **kwargs)
+        return await self.messenger_cog.safe_send_message(dest, content, **kwargs)
 
     async def safe_delete_message(self, message, *, quiet=False):
         '''Deletes a sent message'''
-        return await self._get_messenger_cog().safe_delete_message(message, quiet=quiet)
+        return await self.messenger_cog.safe_delete_message(message, quiet=quiet)
 
     async def _get_player(self, channel) -> MusicPlayer:
-        return await self._get_player_cog().get_player(channel)
+        return await self.player_cog.get_player(channel)
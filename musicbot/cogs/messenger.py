@@ -1,14 +1,16 @@
 '''Module containing messenger cog'''
 import asyncio
 import logging
-from typing import Optional, Union
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple, Union
 
 import discord
-from discord import Embed, TextChannel
+from discord import Embed, Message, TextChannel
 from discord.ext.commands import Context
 from dislash import SlashInteraction
 
 from ..constants import DISCORD_MSG_CHAR_LIMIT
+from ..constructs import Ratelimit
 from .custom_cog import CustomCog
 
 log = logging.getLogger(__name__)
@@ -16,8 +18,66 @@ log = logging.getLogger(__name__)
 Content = Union[str, Embed]
 Destination = Union[Context, SlashInteraction, TextChannel]
 
+# Messages expiring within this window of each other are deleted together
+EXPIRY_WINDOW = 1.0
+# Max amount of messages that Discord accepts on a single bulk delete
+BULK_DELETE_LIMIT = 100
+# Time during which queued notices are gathered into a single message
+BATCH_INTERVAL = 0.5
+# Amount of channel ratelimits kept before the idle ones are dropped
+RATELIMITS_SIZE = 256
+
+def _send_to_channel(channel: TextChannel, content: Content, tts: bool):
+    return channel.send(content, tts=tts)
+
+def _reply(dest, content: Content, tts: bool):
+    if isinstance(content, Embed):
+        return dest.reply(embed=content)
+    return dest.reply(content, tts=tts)
+
+Sender = Tuple[Callable[[Destination], TextChannel], Callable]
+
 class MessengerCog(CustomCog):
     '''Cog class in charge of sending and removing messages'''
+    _SEND_DISPATCH: Dict[type, Sender] = {}
+
+    def __init__(self, bot):
+        super().__init__(bot)
+        self._expiry_bucket: Dict[int, List[Tuple[float, Message]]] = defaultdict(list)
+        self._expiry_flushers: Dict[int, asyncio.Future] = {}
+        self._expiry_targets: Dict[int, float] = {}
+        self._expiry_wakeups: Dict[int, asyncio.Event] = {}
+        self._ratelimits: Dict[int, Ratelimit] = {}
+        self._pending_messages: Dict[Tuple[int, Optional[float]], List[str]] = defaultdict(list)
+        self._batch_flushers: Dict[Tuple[int, Optional[float]], asyncio.Future] = {}
+
+    def cog_unload(self):
+        for flusher in (*self._expiry_flushers.values(), *self._batch_flushers.values()):
+            flusher.cancel()
+
+    def _get_ratelimit(self, channel_id: int) -> Ratelimit:
+        ratelimit = self._ratelimits.get(channel_id)
+        if ratelimit is None:
+            if len(self._ratelimits) >= RATELIMITS_SIZE:
+                idle = [key for key, value in self._ratelimits.items() if value.idle]
+                for key in idle:
+                    del self._ratelimits[key]
+            ratelimit = self._ratelimits[channel_id] = Ratelimit()
+        return ratelimit
+
+    @classmethod
+    def _get_sender(cls, dest_type: type) -> Sender:
+        '''Returns how to get the channel and send a message to a destination
+        type, resolved once per type'''
+        sender = cls._SEND_DISPATCH.get(dest_type)
+        if sender is None:
+            if issubclass(dest_type, TextChannel):
+                sender = (lambda dest: dest, _send_to_channel)
+            else:
+                sender = (lambda dest: dest.channel, _reply)
+            cls._SEND_DISPATCH[dest_type] = sender
+        return sender
+
     async def safe_send_message(self, dest: Destination, content: Content, **kwargs):
         '''Send messages to the specified destination'''
         tts: bool = kwargs.pop('tts', False)
@@ -30,12 +90,9 @@ class MessengerCog(CustomCog):
 
         try:
             if content is not None or allow_none:
-                if isinstance(dest, TextChannel):
-                    msg = await dest.send(content, tts=tts, delete_after=expire_in)
-                elif isinstance(content, Embed):
-                    msg = await dest.reply(embed=content, delete_after=expire_in)
-                else:
-                    msg = await dest.reply(content, tts=tts, delete_after=expire_in)
+                get_channel, send = self._get_sender(type(dest))
+                async with self._get_ratelimit(get_channel(dest).id):
+                    msg = await send(dest, content, tts)
 
         except discord.Forbidden:
             log_func("Cannot send message to \"%s\", no permission", dest.name)
@@ -50,21 +107,133 @@ class MessengerCog(CustomCog):
                 log_func("Failed to send message")
                 log.noise("Got HTTPException trying to send message to %s: %s", dest, content)
 
+        if msg is not None and expire_in is not None:
+            self._schedule_delete(msg, expire_in)
+
         return msg
 
-    async def _wait_delete_msg(self, message, after):
-        await asyncio.sleep(after)
-        await self.safe_delete_message(message, quiet=True)
+    def enqueue_message(self, channel: TextChannel, content: str, *, expire_in=None):
+        '''Queues a notice for channel, notices queued close together are sent
+        joined in as few messages as possible'''
+        key = (channel.id, expire_in)
+        self._pending_messages[key].append(content)
+        if key not in self._batch_flushers:
+            flusher = self._batch_flushers[key] = asyncio.ensure_future(
+                self._flush_pending(channel, key)
+            )
+            flusher.add_done_callback(self._flusher_done)
+
+    async def _flush_pending(self, channel: TextChannel, key):
+        expire_in = key[1]
+        pending = self._pending_messages[key]
+        try:
+            while pending:
+                await asyncio.sleep(BATCH_INTERVAL)
+                contents = pending[:]
+                pending.clear()
+                for content in self._join_contents(contents):
+                    try:
+                        await self.safe_send_message(channel, content, expire_in=expire_in)
+                    except Exception:
+                        log.error("Failed to send queued message", exc_info=True)
+        finally:
+            del self._batch_flushers[key]
+            self._pending_messages.pop(key, None)
+
+    @staticmethod
+    def _flusher_done(flusher: asyncio.Future):
+        if not flusher.cancelled() and flusher.exception() is not None:
+            log.error("Message flusher stopped", exc_info=flusher.exception())
+
+    @staticmethod
+    def _join_contents(contents: List[str]):
+        chunk = contents[0]
+        for content in contents[1:]:
+            if len(chunk) + len(content) + 1 > DISCORD_MSG_CHAR_LIMIT:
+                yield chunk
+                chunk = content
+            else:
+                chunk += '\n' + content
+        yield chunk
+
+    def _schedule_delete(self, message: Message, after: float):
+        '''Queues the message to be deleted together with the ones expiring
+        at the same time in its channel'''
+        channel_id = message.channel.id
+        deadline = self.bot.loop.time() + after
+        self._expiry_bucket[channel_id].append((deadline, message))
+        if channel_id not in self._expiry_flushers:
+            self._expiry_flushers[channel_id] = asyncio.ensure_future(
+                self._flush_bucket(message.channel)
+            )
+        elif deadline < self._expiry_targets.get(channel_id, deadline):
+            # The flusher is sleeping until a later deadline, wake it up
+            self._expiry_wakeups[channel_id].set()
+
+    async def _flush_bucket(self, channel):
+        loop = self.bot.loop
+        bucket = self._expiry_bucket[channel.id]
+        wakeup = self._expiry_wakeups[channel.id] = asyncio.Event()
+        try:
+            while bucket:
+                earliest = min(deadline for deadline, _ in bucket)
+                self._expiry_targets[channel.id] = earliest
+                wakeup.clear()
+                try:
+                    await asyncio.wait_for(
+                        wakeup.wait(), max(0, earliest - loop.time()) + EXPIRY_WINDOW
+                    )
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+                now = loop.time()
+                due = [message for deadline, message in bucket if deadline <= now]
+                bucket[:] = [item for item in bucket if item[0] > now]
+                try:
+                    await self._delete_messages(channel, due)
+                except Exception:
+                    log.error("Failed to delete expired messages", exc_info=True)
+        finally:
+            del self._expiry_flushers[channel.id]
+            del self._expiry_wakeups[channel.id]
+            self._expiry_targets.pop(channel.id, None)
+            if not bucket:
+                self._expiry_bucket.pop(channel.id, None)
+
+    async def _delete_messages(self, channel, messages: List[Message]):
+        if not isinstance(channel, TextChannel) or \
+           not channel.permissions_for(channel.guild.me).manage_messages:
+            # Bulk deleting requires manage messages, delete them one by one
+            for message in messages:
+                await self.safe_delete_message(message, quiet=True)
+            return
+
+        for start in range(0, len(messages), BULK_DELETE_LIMIT):
+            batch = messages[start:start + BULK_DELETE_LIMIT]
+            if len(batch) == 1:
+                await self.safe_delete_message(batch[0], quiet=True)
+                continue
+            try:
+                async with self._get_ratelimit(channel.id):
+                    await channel.delete_messages(batch)
+            except discord.HTTPException:
+                # Fallback to one by one, i.e. if a message got too old to be bulk deleted
+                for message in batch:
+                    await self.safe_delete_message(message, quiet=True)
 
     async def safe_delete_message(self, message, *, quiet=False):
         '''Deletes a sent message'''
         log_func = log.debug if quiet else log.warning
 
         try:
-            return await message.delete()
+            async with self._get_ratelimit(message.channel.id):
+                return await message.delete()
 
         except discord.Forbidden:
             log_func("Cannot delete message \"%s\", no permission", message.clean_content)
 
         except discord.NotFound:
             log_func("Cannot delete message \"%s\", message not found", message.clean_content)
+
+        except discord.HTTPException:
+            log_func("Failed to delete message \"%s\"", message.clean_content)
@@ -1,7 +1,11 @@
 '''Module containing MusicManagerCog.'''
-from datetime import timedelta
+from bisect import bisect_right
+from functools import cached_property
+from itertools import accumulate, islice
 from math import ceil
+from operator import attrgetter
 from typing import Optional
+import asyncio
 import logging
 
 from discord.ext.commands import Context
@@ -9,7 +13,8 @@ from dislash import command, Option, OptionType
 
 from ..constants import DISCORD_MSG_CHAR_LIMIT
 from ..exceptions import CommandError, PermissionsError
-from ..utils import ftimedelta
+from ..player import MusicPlayer
+from ..utils import fseconds
 from .custom_cog import CustomCog as Cog
 
 log = logging.getLogger(__name__)
@@ -18,59 +23,94 @@ class MusicManagerCog(Cog):
     '''
     Class in charge of managing the music commands aside from play.
     '''
+    # Replies without placeholders, resolved once when the cog is created
+    _STRINGS = (
+        ('_msg_pause_none', 'cmd-pause-none', 'Player is not playing.'),
+        ('_msg_resume_none', 'cmd-resume-none', 'Player is not paused.'),
+        ('_msg_remove_none', 'cmd-remove-none', "There's nothing to remove!"),
+        (
+            '_msg_remove_noperms',
+            'cmd-remove-noperms',
+            "You do not have the valid permissions to remove that entry from the queue, make"
+            " sure you're the one who queued it or have instant skip permissions"
+        ),
+        ('_msg_skip_none', 'cmd-skip-none', "Can't skip! The player is not playing!"),
+        ('_msg_skip_next', 'cmd-skip-reply-skipped-2', ' Next song coming up!'),
+        ('_msg_skip_person', 'cmd-skip-reply-voted-2', 'person is'),
+        ('_msg_skip_people', 'cmd-skip-reply-voted-3', 'people are'),
+    )
 
-    @command(description='Pauses the audio')
-    async def pause(self, context: Context):
-        '''Pauses the audio'''
+    def __init__(self, bot):
+        super().__init__(bot)
+        self._pending_replies = set()
+
+    def cog_unload(self):
+        for reply in self._pending_replies:
+            reply.cancel()
+
+    def _reply_done(self, reply: asyncio.Future):
+        self._pending_replies.discard(reply)
+        if not reply.cancelled() and reply.exception() is not None:
+            log.error('Failed to send player action reply', exc_info=reply.exception())
+
+    async def _player_action(
+        self, context: Context, action, reply_key, reply_default, *,
+        refuse_if=None, refusal: Optional[str] = None, of_guild: bool = False
+    ):
+        '''
+        Runs action over the player and replies with the template formatted
+        with the player's voice channel, or its guild if of_guild is set
+        '''
         player = await self._get_player(context.channel)
+        if refuse_if is not None and refuse_if(player):
+            raise CommandError(refusal, expire_in=30)
 
-        if player.is_paused:
-            error_msg = self.str.get('cmd-pause-none', 'Player is not playing.')
-            raise CommandError(error_msg, expire_in=30)
+        action(player)
+        channel = player.voice_client.channel
+        msg = self.str.get(reply_key, reply_default).format(channel.guild if of_guild else channel)
+        # Nothing depends on the acknowledgement, so don't hold the command on it
+        reply = asyncio.ensure_future(self.safe_send_message(context, msg))
+        self._pending_replies.add(reply)
+        reply.add_done_callback(self._reply_done)
 
-        player.pause()
-        msg = self.str.get(
-            'cmd-pause-reply', 'Paused music in `{0.name}`'
-        ).format(player.voice_client.channel)
-        await self.safe_send_message(context, msg)
+    @command(description='Pauses the audio')
+    async def pause(self, context: Context):
+        '''Pauses the audio'''
+        await self._player_action(
+            context, MusicPlayer.pause, 'cmd-pause-reply', 'Paused music in `{0.name}`',
+            refuse_if=attrgetter('is_paused'), refusal=self._msg_pause_none
+        )
 
     @command(description='Resumes the audio from where it stopped')
     async def resume(self, context: Context):
         '''Resumes the audio from where it stopped'''
-        player = await self._get_player(context.channel)
-
-        if player.is_playing:
-            error_msg = self.str.get('cmd-resume-none', 'Player is not paused.')
-            raise CommandError(error_msg, expire_in=30)
-
-        player.resume()
-        msg = self.str.get(
-            'cmd-resume-reply',
-            'Resumed music in `{0.name}`'
-        ).format(player.voice_client.channel)
-        await self.safe_send_message(context, msg)
+        await self._player_action(
+            context, MusicPlayer.resume, 'cmd-resume-reply', 'Resumed music in `{0.name}`',
+            refuse_if=attrgetter('is_playing'), refusal=self._msg_resume_none
+        )
 
     @command(description='Shuffles the queue')
     async def shuffle(self, context: Context):
         '''Shuffles the queue'''
-        player = await self._get_player(context.channel)
-        player.playlist.shuffle()
-        msg = self.str.get(
-            'cmd-shuffle-reply',
-            "Shuffled `{0}`'s queue."
-        ).format(player.voice_client.channel.guild)
-        await self.safe_send_message(context, msg)
+        await self._player_action(
+            context, lambda player: player.playlist.shuffle(),
+            'cmd-shuffle-reply', "Shuffled `{0}`'s queue.", of_guild=True
+        )
 
     @command(description='Remove all entries in the queue')
     async def clear(self, context: Context):
         '''Remove all entries in the queue'''
-        player = await self._get_player(context.channel)
-        player.playlist.clear()
-        msg = self.str.get(
-            'cmd-clear-reply',
-            "Cleared `{0}`'s queue"
-        ).format(player.voice_client.channel.guild)
-        await self.safe_send_message(context, msg)
+        await self._player_action(
+            context, lambda player: player.playlist.clear(),
+            'cmd-clear-reply', "Cleared `{0}`'s queue", of_guild=True
+        )
+
+    def _invalid_number_error(self):
+        error_msg = self.str.get(
+            'cmd-remove-invalid',
+            'Invalid number. Use {0}queue to find queue positions.'
+        ).format(self.config.command_prefix)
+        return CommandError(error_msg, expire_in=20)
 
     @command(
         description='Removes a given entry of the queue, or removes the last one',
@@ -84,112 +124,104 @@ class MusicManagerCog(Cog):
     )
     async def remove(self, context: Context, index: Optional[str]=None):
         '''Removes a given entry of the queue, or removes the last one'''
-        player_cog = self._get_player_cog()
+        player_cog = self.player_cog
         player = await player_cog.get_player(context.channel)
         if not player.playlist.entries:
-            error_msg = self.str.get('cmd-remove-none', "There's nothing to remove!")
-            raise CommandError(error_msg, expire_in=20)
+            raise CommandError(self._msg_remove_none, expire_in=20)
         if not index:
             index = len(player.playlist.entries)
 
-        error_msg = self.str.get(
-            'cmd-remove-invalid',
-            'Invalid number. Use {0}queue to find queue positions.'
-        ).format(self.config.command_prefix)
-        invalid_number_error = CommandError(error_msg, expire_in=20)
-        try:
+        if isinstance(index, str) and index.isdecimal():
             index = int(index)
-        except (TypeError, ValueError) as err:
-            raise invalid_number_error from err
-
-        if index > len(player.playlist.entries):
-            raise invalid_number_error
+        if not isinstance(index, int) or not 0 < index <= len(player.playlist.entries):
+            raise self._invalid_number_error()
 
         author = context.author
         permissions = self.permissions.for_user(author)
-        entry_author = player.playlist.get_entry_at_index(index - 1).meta.get('author', None)
-        is_allowed = permissions.remove or author == entry_author
-        if not is_allowed:
-            error_msg = self.str.get(
-                'cmd-remove-noperms',
-                "You do not have the valid permissions to remove that entry from the queue, make"
-                " sure you're the one who queued it or have instant skip permissions"
-            )
-            raise PermissionsError(error_msg, expire_in=20)
-
-        entry = player.playlist.delete_entry_at_index((index - 1))
-        if entry.meta.get('channel', False) and entry.meta.get('author', False):
+        if not permissions.remove:
+            entry_author = player.playlist.get_entry_at_index(index - 1).meta.get('author', None)
+            if author != entry_author:
+                raise PermissionsError(self._msg_remove_noperms, expire_in=20)
+
+        entry = player.playlist.pop_entry_at_index(index - 1)
+        entry_author = entry.meta.get('author')
+        if entry_author and entry.meta.get('channel'):
             response_msg = self.str.get(
                 'cmd-remove-reply-author',
                 "Removed entry `{0}` added by `{1}`"
-            ).format(entry.title, entry.meta['author'].name)
+            ).format(entry.title, entry_author.name)
         else:
             response_msg = self.str.get(
                 'cmd-remove-reply-noauthor',
                 "Removed entry `{0}`"
             ).format(entry.title)
         response_msg = response_msg.strip()
-        await player_cog.serialize_queue(player.voice_client.channel.guild)
+        player_cog.schedule_serialize_queue(player.voice_client.channel.guild)
         await self.safe_send_message(context, response_msg)
 
     def _is_playing_line(self, player):
-        # TODO: Fix timedelta garbage with util function
-        song_progress = ftimedelta(timedelta(seconds=player.progress))
-        song_total = ftimedelta(timedelta(seconds=player.current_entry.duration))
-        prog_str = '`[%s/%s]`' % (song_progress, song_total)
-
-        if player.current_entry.meta.get('channel', False) and \
-           player.current_entry.meta.get('author', False):
+        current = player.current_entry
+        meta = current.meta
+        song_progress = fseconds(player.progress)
+        song_total = fseconds(current.duration)
+        prog_str = f'`[{song_progress}/{song_total}]`'
+
+        author = meta.get('author')
+        if author and meta.get('channel'):
             return self.str.get(
                 'cmd-queue-playing-author',
                 "Currently playing: `{0}` added by `{1}` {2}\n"
-            ).format(
-                player.current_entry.title,
-                player.current_entry.meta['author'].nae,
-                prog_str
-            )
+            ).format(current.title, author.name, prog_str)
         return self.str.get(
             'cmd-queue-playing-noauthor',
             "Currently playing: `{0}` {1}\n"
-        ).format(player.current_entry.title, prog_str)
+        ).format(current.title, prog_str)
+
+    @cached_property
+    def _format_entry_author(self):
+        default = '{0} -- `{1}` by `{2}`'
+        template = self.str.get('cmd-queue-entry-author', default)
+        if template == default:
+            return lambda i, title, author: f'{i} -- `{title}` by `{author}`'
+        return lambda i, title, author: template.format(i, title, author).strip()
+
+    @cached_property
+    def _format_entry_noauthor(self):
+        default = '{0} -- `{1}`'
+        template = self.str.get('cmd-queue-entry-noauthor', default)
+        if template == default:
+            return lambda i, title: f'{i} -- `{title}`'
+        return lambda i, title: template.format(i, title).strip()
 
     def _get_next_line(self, i: int, item: object):
-        if item.meta.get('channel', False) and item.meta.get('author', False):
-            next_line = self.str.get(
-                'cmd-queue-entry-author',
-                '{0} -- `{1}` by `{2}`'
-            ).format(i, item.title, item.meta['author'].name)
-        else:
-            next_line = self.str.get(
-                'cmd-queue-entry-noauthor',
-                '{0} -- `{1}`'
-            ).format(i, item.title)
-        return next_line.strip()
+        meta = item.meta
+        author = meta.get('author')
+        if author and meta.get('channel'):
+            return self._format_entry_author(i, item.title, author.name)
+        return self._format_entry_noauthor(i, item.title)
 
     @command(description='Displays a queue of the following entries')
     async def queue(self, context: Context):
         '''Displays a queue of the following entries'''
         player = await self._get_player(context.channel)
-        lines = []
-        unlisted = 0
-        and_more_text = '* ... and %s more*' % ('x' * len(player.playlist.entries))
-
-        if player.is_playing:
-            lines.append(self._is_playing_line(player))
-
-        current_line_sum = len(lines[0]) + 1 if player.is_playing else 0
-        for i, item in enumerate(player.playlist, 1):
-            next_line = self._get_next_line(i, item)
-            potential_len = current_line_sum + len(next_line) + len(and_more_text)
-            if potential_len > DISCORD_MSG_CHAR_LIMIT or \
-               i > self.config.queue_length:
-                if current_line_sum + len(and_more_text):
-                    unlisted += 1
-                    continue
-
-            lines.append(next_line)
-            current_line_sum += len(next_line) + 1
-
+        lines = [self._is_playing_line(player)] if player.is_playing else []
+        # Room reserved for the "and N more" line, only rendered if needed
+        total = len(player.playlist.entries)
+        and_more_len = len('* ... and  more*') + len(str(total))
+
+        get_next_line = self._get_next_line
+        entry_lines = [
+            get_next_line(i, item)
+            for i, item in enumerate(islice(player.playlist, self.config.queue_length), 1)
+        ]
+        # Every line takes its length plus the newline that joins it
+        budget = DISCORD_MSG_CHAR_LIMIT - and_more_len + 1
+        if lines:
+            budget -= len(lines[0]) + 1
+        shown = bisect_right(list(accumulate(len(line) + 1 for line in entry_lines)), budget)
+        lines.extend(entry_lines[:shown])
+
+        unlisted = total - shown
         if unlisted > 0:
             lines.append(self.str.get('cmd-queue-more', '\n... and %s more') % unlisted)
 
@@ -209,19 +241,19 @@ class MusicManagerCog(Cog):
         '''Allows to skip the current song'''
         player = await self._get_player(context.channel)
         if player.is_stopped:
-            error_msg = self.str.get('cmd-skip-none', "Can't skip! The player is not playing!")
-            raise CommandError(error_msg, expire_in=20)
+            raise CommandError(self._msg_skip_none, expire_in=20)
 
         if not player.current_entry:
-            if player.playlist.peek():
-                if player.playlist.peek()._is_downloading:
+            next_entry = player.playlist.peek()
+            if next_entry:
+                if next_entry._is_downloading:
                     response_msg = self.str.get(
                         'cmd-skip-dl',
                         "The next song (`%s`) is downloading, please wait."
-                    ) % player.playlist.peek().title
+                    ) % next_entry.title
                     return await self.safe_send_message(context, response_msg)
 
-                if player.playlist.peek().is_downloaded:
+                if next_entry.is_downloaded:
                     print("The next song will be played shortly. Please wait.")
                 else:
                     print("Something odd is happening.  "
@@ -232,32 +264,30 @@ class MusicManagerCog(Cog):
 
         current_entry = player.current_entry
 
-        voice_channel = context.guild.me.voice.channel
-        num_voice = sum(
-            1 for m in voice_channel.members
-              if not (m.voice.deaf or m.voice.self_deaf or m == self.bot.user)
-        )
+        guild = context.guild
+        num_voice = 0
+        for user_id, voice in guild.me.voice.channel.voice_states.items():
+            if voice.deaf or voice.self_deaf:
+                continue
+            member = guild.get_member(user_id)
+            if member is None or member.bot:
+                continue
+            num_voice += 1
 
-        # In case all users are deafened, to avoid division by zero
-        if num_voice == 0:
-            num_voice = 1
+        # In case all users are deafened, at least one vote is required
+        num_voice = num_voice or 1
 
         # TODO: Check how to use this
         # num_skips = player.skip_state.add_skipper(context.author.id, context.message)
         num_skips = 1
 
-        skips_remaining = min(
-            self.config.skips_required,
-            ceil(self.config.skip_ratio_required / (1 / num_voice))
-        ) - num_skips
+        ratio = self.config.skip_ratio_required
+        skips_remaining = min(self.config.skips_required, ceil(ratio * num_voice)) - num_skips
 
         if skips_remaining <= 0:
             # check autopause stuff here
             player.skip()
-            extra_msg = self.str.get(
-                'cmd-skip-reply-skipped-2',
-                ' Next song coming up!'
-            ) if player.playlist.peek() else ''
+            extra_msg = self._msg_skip_next if player.playlist.peek() else ''
             response_msg = self.str.get(
                 'cmd-skip-reply-skipped-1',
                 'Your skip for `{0}` was acknowledged.\nThe vote to skip has been passed.{1}'
@@ -266,9 +296,7 @@ class MusicManagerCog(Cog):
         else:
             # TODO: When a song gets skipped, delete the old x needed to skip
             # messages
-            extra_msg = self.str.get('cmd-skip-reply-voted-2', 'person is') \
-                        if skips_remaining == 1 \
-                        else self.str.get('cmd-skip-reply-voted-3', 'people are')
+            extra_msg = self._msg_skip_person if skips_remaining == 1 else self._msg_skip_people
             response_msg = self.str.get(
                 'cmd-skip-reply-voted-1',
                 'Your skip for `{0}` was acknowledged.\n**{1}** more {2}'
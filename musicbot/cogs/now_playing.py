@@ -1,5 +1,4 @@
 '''NowPlaying Cog module'''
-from datetime import timedelta
 import logging
 
 from discord import Guild
@@ -8,7 +7,7 @@ from dislash import command
 
 from ..exceptions import CommandError
 from ..playlist import StreamPlaylistEntry
-from ..utils import ftimedelta
+from ..utils import fseconds
 from .custom_cog import CustomCog as Cog
 
 log = logging.getLogger(__name__)
@@ -17,9 +16,8 @@ class NowPlayingCog(Cog):
     '''Cog class in charge of the now_playing command'''
     def get_prog_bar(self, player, streaming: bool):
         '''Gets the progress related strings'''
-        # TODO: Fix timedelta garbage with util function
-        song_progress = ftimedelta(timedelta(seconds=player.progress))
-        song_total = ftimedelta(timedelta(seconds=player.current_entry.duration))
+        song_progress = fseconds(player.progress)
+        song_total = fseconds(player.current_entry.duration)
 
         prog_str = ('`[{progress}]`' if streaming else '`[{progress}/{total}]`').format(
             progress=song_progress, total=song_total
@@ -31,9 +29,8 @@ class NowPlayingCog(Cog):
 
         # create the actual bar
         progress_bar_length = 30
-        prog_bar_str = ''
-        for i in range(progress_bar_length):
-            prog_bar_str += '□' if percentage < 1 / progress_bar_length * i else '■'
+        filled = min(progress_bar_length, int(percentage * progress_bar_length))
+        prog_bar_str = '■' * filled + '□' * (progress_bar_length - filled)
 
         return prog_str, prog_bar_str
 
@@ -59,33 +56,29 @@ class NowPlayingCog(Cog):
         action_text = self.str.get('cmd-np-action-streaming', 'Streaming') if streaming \
                       else self.str.get('cmd-np-action-playing', 'Playing')
 
-        author_is_known = player.current_entry.meta.get('channel', False) and \
-                          player.current_entry.meta.get('author', False)
-        if author_is_known:
-            np_text = self.str.get(
+        entry = player.current_entry
+        fields = {
+            'action': action_text,
+            'title': entry.title,
+            'progress_bar': prog_bar_str,
+            'progress': prog_str,
+            'url': entry.url,
+        }
+        author = entry.meta.get('author', False)
+        if entry.meta.get('channel', False) and author:
+            fields['author'] = author.name
+            template = self.str.get(
                 'cmd-np-reply-author',
                 "Now {action}: **{title}** added by **{author}**\nProgress: {progress_bar} "
                 "{progress}\n\N{WHITE RIGHT POINTING BACKHAND INDEX} <{url}>"
-            ).format(
-                action=action_text,
-                title=player.current_entry.title,
-                author=player.current_entry.meta['author'].name,
-                progress_bar=prog_bar_str,
-                progress=prog_str,
-                url=player.current_entry.url
             )
         else:
-            np_text = self.str.get(
+            template = self.str.get(
                 'cmd-np-reply-noauthor',
                 "Now {action}: **{title}**\nProgress: {progress_bar} {progress}"
                 "\n\N{WHITE RIGHT POINTING BACKHAND INDEX} <{url}>"
-            ).format(
-                action=action_text,
-                title=player.current_entry.title,
-                progress_bar=prog_bar_str,
-                progress=prog_str,
-                url=player.current_entry.url
             )
+        np_text = template.format_map(fields)
 
-        self.server_specific_data[guild]['last_np_msg'] = \
+        self.server_specific_data[guild].last_np_msg = \
             await self.safe_send_message(context, np_text)
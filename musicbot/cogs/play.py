@@ -1,40 +1,55 @@
 '''Play Cog module'''
 from dataclasses import dataclass
+from functools import lru_cache
 from random import shuffle
 from typing import Optional
-import asyncio
+from urllib.error import URLError
 import logging
 import re
 import time
-import traceback
 
 import discord
 from discord import Member
 from discord.ext.commands import Context
 from dislash import command, Option, OptionType
+from youtube_dl.utils import DownloadError
 
 from ..exceptions import CommandError, PermissionsError, SpotifyError
 from ..permissions import Permissions
 from ..player import MusicPlayer
 from ..spotify import Spotify
-from ..utils import _func_, fixg, ftimedelta
+from ..utils import fixg, ftimedelta
 from .custom_cog import CustomCog
 
 log = logging.getLogger(__name__)
 
-LINKS_REGEX = '((http(s)*:[/][/]|www.)([a-z]|[A-Z]|[0-9]|[/.]|[~])*)'
+LINK_PREFIXES = ('http://', 'https://', 'www.')
 PLAYLIST_REGEX = r'watch\?v=.+&(list=[^&]+)'
 
+_PLAYLIST_RE = re.compile(PLAYLIST_REGEX)
+_SPOTIFY_URL_RE = re.compile(r'(http[s]?:\/\/)?(open.spotify.com)\/')
+_QUERY_STRING_RE = re.compile(r'\?.*')
+
+# Playlist extractors and the Playlist method used to queue their entries
+PLAYLIST_PROCESSORS = {
+    'youtube:playlist': 'async_process_youtube_playlist',
+    'soundcloud:set': 'async_process_sc_bc_playlist',
+    'bandcamp:album': 'async_process_sc_bc_playlist',
+}
+
+@lru_cache(maxsize=1024)
 def parse_song_url(song_query: str):
     '''Given a song query it sanitizes it, in case that is a url'''
-    song_url = song_query.strip('<>')
+    song_url = song_query
+    # Discord users wrap links in <> to avoid embeds
+    if song_url[:1] == '<' or song_url[-1:] == '>':
+        song_url = song_url.strip('<>')
     # Make sure forward slashes work properly in search queries
-    pattern = re.compile(LINKS_REGEX)
-    match_url = pattern.match(song_url)
-    song_url = song_url.replace('/', '%2F') if match_url is None else song_url
+    if not song_url.startswith(LINK_PREFIXES):
+        song_url = song_url.replace('/', '%2F')
 
     # Rewrite YouTube playlist URLs if the wrong URL type is given
-    matches = re.search(PLAYLIST_REGEX, song_url)
+    matches = _PLAYLIST_RE.search(song_url)
     groups = matches.groups() if matches is not None else []
     song_url = "https://www.youtube.com/playlist?" + groups[0] if len(groups) > 0 else song_url
     return song_url
@@ -42,12 +57,19 @@ def parse_song_url(song_query: str):
 def parser_song_url_spotify(song_url: str):
     '''Sanitizes a song url to be used in the case that is a spotify url'''
     if 'open.spotify.com' in song_url:
-        regex_result = re.sub(r'(http[s]?:\/\/)?(open.spotify.com)\/', '', song_url)
+        regex_result = _SPOTIFY_URL_RE.sub('', song_url)
         regex_result = regex_result.replace('/', ':')
         song_url = 'spotify:' + regex_result
-        song_url = re.sub(r'\?.*', '', song_url)
+        song_url = _QUERY_STRING_RE.sub('', song_url)
     return song_url
 
+def count_entries(entries) -> int:
+    '''Counts the entries, without consuming them unless they are a generator'''
+    try:
+        return len(entries)
+    except TypeError:
+        return sum(1 for _ in entries)
+
 @dataclass
 class PlayRequirements:
     '''Helper class to contain the required arguments for play functions'''
@@ -57,11 +79,33 @@ class PlayRequirements:
     player: MusicPlayer
     shuffle: bool
     song_url: str
+    user_count: Optional[int] = None
 
 class PlayCog(CustomCog):
     '''Cog class in charge of the main play command'''
+    _STRINGS = (
+        ('_msg_novc', 'cmd-summon-novc', 'You are not connected to voice. Try joining a voice channel!'),
+        ('_msg_limit', 'cmd-play-limit', 'You have reached your enqueued song limit ({0})'),
+        ('_msg_karaoke', 'karaoke-enabled', 'Karaoke mode is enabled, please try again when its disabled!'),
+        ('_msg_noinfo', 'cmd-play-noinfo', 'That video cannot be played. Try using the {0}stream command.'),
+        (
+            '_msg_badextractor',
+            'cmd-play-badextractor',
+            'You do not have permission to play media from this service.'
+        ),
+        ('_msg_song_reply', 'cmd-play-song-reply', "Enqueued `%s` to be played. Position in queue: %s"),
+        (
+            '_msg_playlist_reply',
+            'cmd-play-playlist-reply',
+            "Enqueued **%s** songs to be played. Position in queue: %s"
+        ),
+        ('_msg_next', 'cmd-play-next', 'Up next!'),
+        ('_msg_eta', 'cmd-play-eta', ' - estimated time until playing: %s'),
+    )
+
     def __init__(self, bot):
         super().__init__(bot)
+        self._msg_noinfo = self._msg_noinfo.format(self.config.command_prefix)
         self.spotify = None
         if self.config._spotify:
             try:
@@ -93,8 +137,19 @@ class PlayCog(CustomCog):
                     player.playlist.loop,
                     song_url,
                     download=False,
-                    process=False
+                    process=False,
+                    cache=True
                 )
+                if info is None:
+                    break
+
+                # Only a url reference can turn out to be a playlist once
+                # processed, anything else is answered by the unprocessed info
+                has_entries = 'entries' in info
+                is_search_url = info.get('url', '').startswith('ytsearch')
+                is_reference = info.get('_type', 'video') in ('url', 'url_transparent')
+                if has_entries or is_search_url or not is_reference:
+                    break
 
                 # If there is an exception arise when processing we go on and
                 # let extract_info down the line report it because info might
@@ -104,18 +159,13 @@ class PlayCog(CustomCog):
                     info_process = await self.downloader.extract_info(
                         player.playlist.loop,
                         song_url,
-                        download=False
+                        download=False,
+                        cache=True
                     )
-                except:
+                except Exception:
                     info_process = None
 
-                if info_process is None or info is None:
-                    break
-
-                is_not_playlist = info_process.get('_type', None) != 'playlist'
-                has_entries = 'entries' in info
-                is_search_url = info.get('url', '').startswith('ytsearch')
-                if is_not_playlist or has_entries or is_search_url:
+                if info_process is None or info_process.get('_type', None) != 'playlist':
                     break
                 use_url = info_process.get('webpage_url', None) or info_process.get('url', None)
                 if use_url == song_url:
@@ -131,51 +181,43 @@ class PlayCog(CustomCog):
                 log.debug('Using "%s" instead', use_url)
                 song_url = use_url
 
-            except Exception as e:
-                if 'unknown url type' in str(e):
-                    # It's probably not actually an extractor
-                    song_url = song_url.replace(':', '')
+            except (ValueError, URLError, DownloadError) as e:
+                # urllib raises these for an unknown url type, possibly wrapped
+                # by youtube_dl, the part before the colon is probably not
+                # actually an extractor
+                if 'unknown url type' not in str(e) or \
+                   ':' not in song_url or song_url.startswith(LINK_PREFIXES):
+                    raise CommandError(e, expire_in=30) from e
+                song_url = song_url.replace(':', '')
+                try:
                     info = await self.downloader.extract_info(
                         player.playlist.loop,
                         song_url,
                         download=False,
                         process=False
                     )
-                else:
-                    raise CommandError(e, expire_in=30) from e
+                except Exception as retry_error:
+                    raise CommandError(retry_error, expire_in=30) from retry_error
+
+            except Exception as e:
+                raise CommandError(e, expire_in=30) from e
 
         return info, song_url
 
-    def _check_for_permissions(self, permissions, player, author):
-        if permissions.max_songs and \
-           player.playlist.count_for_user(author) >= permissions.max_songs:
-            error_msg = self.str.get(
-                'cmd-play-limit',
-                'You have reached your enqueued song limit ({0})'
-            ).format(permissions.max_songs)
+    def _check_for_permissions(self, permissions, player, user_count):
+        if permissions.max_songs and user_count >= permissions.max_songs:
+            error_msg = self._msg_limit.format(permissions.max_songs)
             raise PermissionsError(error_msg, expire_in=30)
 
         if player.karaoke_mode and not permissions.bypass_karaoke_mode:
-            error_msg = self.str.get(
-                'karaoke-enabled',
-                'Karaoke mode is enabled, please try again when its disabled!'
-            )
-            raise PermissionsError(error_msg, expire_in=30)
+            raise PermissionsError(self._msg_karaoke, expire_in=30)
 
     def _check_valid_info(self, info, permissions):
         if not info:
-            error_msg = self.str.get(
-                'cmd-play-noinfo',
-                'That video cannot be played. Try using the {0}stream command.'
-            ).format(self.config.command_prefix)
-            raise CommandError(error_msg, expire_in=30)
+            raise CommandError(self._msg_noinfo, expire_in=30)
 
         if info.get('extractor', '') not in permissions.extractors and permissions.extractors:
-            error_msg = self.str.get(
-                'cmd-play-badextractor',
-                'You do not have permission to play media from this service.'
-            )
-            raise PermissionsError(error_msg, expire_in=30)
+            raise PermissionsError(self._msg_badextractor, expire_in=30)
 
     async def _search_song(self, player, song_url: str, channel):
         '''
@@ -187,9 +229,9 @@ class PlayCog(CustomCog):
             song_url,
             download=False,
             process=True,
-            on_error=lambda e: asyncio.ensure_future(
-                self.safe_send_message(channel, "```\n%s\n```" % e, expire_in=120),
-                loop=self.bot.loop
+            cache=True,
+            on_error=lambda e: self.messenger_cog.enqueue_message(
+                channel, f"```\n{e}\n```", expire_in=120
             ),
             retry_on_error=True
         )
@@ -209,17 +251,16 @@ class PlayCog(CustomCog):
             return None, None
 
         # TODO: handle 'webpage_url' being 'ytsearch:...' or extractor type
-        song_url = info['entries'][0]['webpage_url']
-        info = await self.downloader.extract_info(
-            player.playlist.loop, song_url, download=False, process=False
-        )
-
-        return song_url, info
+        # The search result is already fully processed, no need to fetch it again
+        info = info['entries'][0]
+        return info['webpage_url'], info
 
     async def _send_playlist_gathering_msg(self, num_songs: int, wait_per_song: float, channel):
-        eta = fixg(num_songs * wait_per_song)
-        eta_msg = self.str.get('cmd-play-playlist-gathering-2', ', ETA: {0} seconds').format(eta) \
-                  if num_songs >= 10 else '.'
+        if num_songs >= 10:
+            eta = fixg(num_songs * wait_per_song)
+            eta_msg = self.str.get('cmd-play-playlist-gathering-2', ', ETA: {0} seconds').format(eta)
+        else:
+            eta_msg = '.'
         safe_msg = self.str.get(
             'cmd-play-playlist-gathering-1',
             'Gathering playlist information for {0} songs{1}'
@@ -232,9 +273,11 @@ class PlayCog(CustomCog):
         permissions = play_req.permissions
         player = play_req.player
 
-        await self._do_playlist_checks(permissions, player, author, info['entries'])
+        await self._do_playlist_checks(
+            permissions, player, author, info['entries'], user_count=play_req.user_count
+        )
 
-        if info['extractor'].lower() in ['youtube:playlist', 'soundcloud:set', 'bandcamp:album']:
+        if info['extractor'].lower() in PLAYLIST_PROCESSORS:
             try:
                 return await self._cmd_play_playlist_async(
                     player,
@@ -263,7 +306,7 @@ class PlayCog(CustomCog):
         # get the speed from that Different playlists might download at
         # different speeds though
         wait_per_song = 1.2
-        num_songs = sum(1 for _ in info['entries'])
+        num_songs = count_entries(info['entries'])
 
         procmesg = await self._send_playlist_gathering_msg(num_songs, wait_per_song, channel)
 
@@ -287,23 +330,22 @@ class PlayCog(CustomCog):
         drop_count = 0
 
         if permissions.max_song_length:
-            for e in entry_list.copy():
-                # Im pretty sure there's no situation where this would ever
-                # break Unless the first entry starts being played, which would
-                # make this a race condition
-                if e.duration > permissions.max_song_length:
-                    player.playlist.entries.remove(e)
-                    entry_list.remove(e)
-                    drop_count += 1
-            if drop_count:
+            # Im pretty sure there's no situation where this would ever
+            # break Unless the first entry starts being played, which would
+            # make this a race condition
+            too_long = [e for e in entry_list if e.duration > permissions.max_song_length]
+            if too_long:
+                drop_count = len(player.playlist.discard_entries(too_long))
                 log.info("Dropped %s songs", drop_count)
 
-        log.info("Processed {} songs in {} seconds at {:.2f}s/song, {:+.2g}/song from expected ({}s)".format(
+        per_song = ttime / listlen if listlen else 0
+        log.info(
+            "Processed %s songs in %s seconds at %.2fs/song, %+.2g/song from expected (%ss)",
             listlen,
             fixg(ttime),
-            ttime / listlen if listlen else 0,
-            ttime / listlen - wait_per_song if listlen - wait_per_song else 0,
-            fixg(wait_per_song * num_songs))
+            per_song,
+            per_song - wait_per_song if listlen else 0,
+            fixg(wait_per_song * num_songs)
         )
 
         await self.safe_delete_message(procmesg)
@@ -317,7 +359,7 @@ class PlayCog(CustomCog):
                 expire_in=30
             )
 
-        reply_text = self.str.get('cmd-play-playlist-reply', "Enqueued **%s** songs to be played. Position in queue: %s")
+        reply_text = self._msg_playlist_reply
         btext = str(listlen - drop_count)
 
         return reply_text, btext, position
@@ -348,7 +390,7 @@ class PlayCog(CustomCog):
 
         entry, position = await player.playlist.add_entry(play_req.song_url, info, channel=channel, author=author)
 
-        reply_text = self.str.get('cmd-play-song-reply', "Enqueued `%s` to be played. Position in queue: %s")
+        reply_text = self._msg_song_reply
         btext = entry.title
         return reply_text, btext, position
 
@@ -464,11 +506,7 @@ class PlayCog(CustomCog):
         permissions = self.permissions.for_user(author)
 
         if author.voice is None:
-            error_msg = self.str.get(
-                'cmd-summon-novc',
-                'You are not connected to voice. Try joining a voice channel!'
-            )
-            raise CommandError(error_msg)
+            raise CommandError(self._msg_novc)
 
         player = await self._get_player(author.voice.channel)
 
@@ -479,8 +517,12 @@ class PlayCog(CustomCog):
         if self.config._spotify and song_url.startswith('spotify:'):
             return await self._handle_spotify(play_req, context)
 
-        async with self.aiolocks[_func_() + ':' + str(author.id)]:
-            self._check_for_permissions(permissions, player, author)
+        async with self.get_lock(('play', author.id)):
+            # Only the author's own commands can change this count and those
+            # are serialized by the lock, so it's walked once per command
+            if permissions.max_songs:
+                play_req.user_count = player.playlist.count_for_user(author)
+            self._check_for_permissions(permissions, player, play_req.user_count)
 
             info, song_url = await self.determine_type(player, song_url)
             self._check_valid_info(info, permissions)
@@ -505,19 +547,18 @@ class PlayCog(CustomCog):
 
         if btext is not None:
             if position == 1 and player.is_stopped:
-                position = self.str.get('cmd-play-next', 'Up next!')
+                position = self._msg_next
                 reply_text %= (btext, position)
 
             else:
                 try:
                     time_until = await player.playlist.estimate_time_until(position, player)
-                    eta_msg = self.str.get('cmd-play-eta', ' - estimated time until playing: %s')
-                    reply_text += eta_msg
-                except:
-                    traceback.print_exc()
-                    time_until = ''
-
-                reply_text %= (btext, position, ftimedelta(time_until))
+                except (TypeError, ValueError, AttributeError):
+                    log.debug('Failed to estimate time until playing', exc_info=True)
+                    reply_text %= (btext, position)
+                else:
+                    reply_text += self._msg_eta
+                    reply_text %= (btext, position, ftimedelta(time_until))
 
         await self.safe_send_message(context, reply_text, expire_in=30)
 
@@ -541,8 +582,8 @@ class PlayCog(CustomCog):
         song_url = parse_song_url(query)
         await self._play(context, song_url, shuffle)
 
-    async def _do_playlist_checks(self, permissions, player, author, testobj):
-        num_songs = sum(1 for _ in testobj)
+    async def _do_playlist_checks(self, permissions, player, author, testobj, user_count=None):
+        num_songs = count_entries(testobj)
 
         # I have to do exe extra checks anyways because you can request an
         # arbitrary number of search results
@@ -557,12 +598,15 @@ class PlayCog(CustomCog):
 
         # This is a little bit weird when it says (x + 0 > y), I might add the
         # other check back in
-        if permissions.max_songs and player.playlist.count_for_user(author) + num_songs > permissions.max_songs:
-            raise PermissionsError(
-                self.str.get('playlists-limit', "Playlist entries + your already queued songs reached limit ({0} + {1} > {2})").format(
-                    num_songs, player.playlist.count_for_user(author), permissions.max_songs),
-                expire_in=30
-            )
+        if permissions.max_songs:
+            if user_count is None:
+                user_count = player.playlist.count_for_user(author)
+            if user_count + num_songs > permissions.max_songs:
+                raise PermissionsError(
+                    self.str.get('playlists-limit', "Playlist entries + your already queued songs reached limit ({0} + {1} > {2})").format(
+                        num_songs, user_count, permissions.max_songs),
+                    expire_in=30
+                )
         return True
 
     async def _cmd_play_playlist_async(self, player, channel, author, permissions, playlist_url, extractor_type):
@@ -576,7 +620,7 @@ class PlayCog(CustomCog):
         if not info:
             raise CommandError(self.str.get('cmd-play-playlist-invalid', "That playlist cannot be played."))
 
-        num_songs = sum(1 for _ in info['entries'])
+        num_songs = count_entries(info['entries'])
         t0 = time.time()
 
         # TODO: From playlist_title
@@ -584,50 +628,31 @@ class PlayCog(CustomCog):
             channel, self.str.get('cmd-play-playlist-process', "Processing {0} songs...").format(num_songs))
         await self.send_typing(channel)
 
-        entries_added = 0
-        if extractor_type == 'youtube:playlist':
-            try:
-                entries_added = await player.playlist.async_process_youtube_playlist(
-                    playlist_url, channel=channel, author=author)
-                # TODO: Add hook to be called after each song
-                # TODO: Add permissions
-
-            except Exception:
-                log.error("Error processing playlist", exc_info=True)
-                raise CommandError(self.str.get('cmd-play-playlist-queueerror', 'Error handling playlist {0} queuing.').format(playlist_url), expire_in=30)
-
-        elif extractor_type.lower() in ['soundcloud:set', 'bandcamp:album']:
-            try:
-                entries_added = await player.playlist.async_process_sc_bc_playlist(
-                    playlist_url, channel=channel, author=author)
-                # TODO: Add hook to be called after each song
-                # TODO: Add permissions
-
-            except Exception:
-                log.error("Error processing playlist", exc_info=True)
-                raise CommandError(self.str.get('cmd-play-playlist-queueerror', 'Error handling playlist {0} queuing.').format(playlist_url), expire_in=30)
+        process_playlist = getattr(player.playlist, PLAYLIST_PROCESSORS[extractor_type.lower()])
+        try:
+            entries_added = await process_playlist(playlist_url, channel=channel, author=author)
+            # TODO: Add hook to be called after each song
+            # TODO: Add permissions
 
+        except Exception:
+            log.error("Error processing playlist", exc_info=True)
+            raise CommandError(self.str.get('cmd-play-playlist-queueerror', 'Error handling playlist {0} queuing.').format(playlist_url), expire_in=30)
 
         songs_processed = len(entries_added)
         drop_count = 0
         skipped = False
 
         if permissions.max_song_length:
-            for e in entries_added.copy():
-                if e.duration > permissions.max_song_length:
-                    try:
-                        player.playlist.entries.remove(e)
-                        entries_added.remove(e)
-                        drop_count += 1
-                    except:
-                        pass
-
-            if drop_count:
+            too_long = [e for e in entries_added if e.duration > permissions.max_song_length]
+            if too_long:
+                dropped = {id(e) for e in player.playlist.discard_entries(too_long)}
+                entries_added = [e for e in entries_added if id(e) not in dropped]
+                drop_count = len(dropped)
                 log.debug('Dropped %s songs', drop_count)
 
             if player.current_entry and player.current_entry.duration > permissions.max_song_length:
-                await self.safe_delete_message(self.server_specific_data[channel.guild]['last_np_msg'])
-                self.server_specific_data[channel.guild]['last_np_msg'] = None
+                await self.safe_delete_message(self.server_specific_data[channel.guild].last_np_msg)
+                self.server_specific_data[channel.guild].last_np_msg = None
                 skipped = True
                 player.skip()
                 entries_added.pop()
@@ -641,13 +666,15 @@ class PlayCog(CustomCog):
         # TODO: actually calculate wait per song in the process function and return that too
 
         # This is technically inaccurate since bad songs are ignored but still take up time
-        log.info("Processed {}/{} songs in {} seconds at {:.2f}s/song, {:+.2g}/song from expected ({}s)".format(
+        per_song = ttime / num_songs if num_songs else 0
+        log.info(
+            "Processed %s/%s songs in %s seconds at %.2fs/song, %+.2g/song from expected (%ss)",
             songs_processed,
             num_songs,
             fixg(ttime),
-            ttime / num_songs if num_songs else 0,
-            ttime / num_songs - wait_per_song if num_songs - wait_per_song else 0,
-            fixg(wait_per_song * num_songs))
+            per_song,
+            per_song - wait_per_song if num_songs else 0,
+            fixg(wait_per_song * num_songs)
         )
 
         if not songs_added:
@@ -659,7 +686,7 @@ class PlayCog(CustomCog):
 
         default_msg = f'Enqueued {songs_added} songs to be played in {fixg(ttime, 1)} seconds'
         reply_text = self.str.get('cmd-play-playlist-reply-secs', default_msg)
-        return reply_text, None
+        return reply_text, None, None
 
     async def send_typing(self, destination):
         try:
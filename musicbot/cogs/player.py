@@ -1,4 +1,5 @@
 from os import path, makedirs
+import asyncio
 import logging
 import random
 import time
@@ -13,7 +14,7 @@ from ..constructs import SkipState
 from ..exceptions import CommandError, ExtractionError
 from ..player import MusicPlayer
 from ..playlist import Playlist
-from ..utils import _func_, write_file
+from ..utils import write_file
 from .custom_cog import CustomCog as Cog
 
 log = logging.getLogger(__name__)
@@ -21,6 +22,8 @@ log = logging.getLogger(__name__)
 class PlayerCog(Cog):
     last_status = None
     players = {}
+    serialize_handles = {}
+    serialize_tasks = {}
 
     async def get_voice_client(self, channel: GuildChannel):
         if isinstance(channel, Object):
@@ -56,7 +59,7 @@ class PlayerCog(Cog):
         if not path.isfile(dir):
             return None
 
-        async with self.aiolocks['queue_serialization' + ':' + str(guild.id)]:
+        async with self.get_lock(('queue_serialization', guild.id)):
             log.debug("Deserializing queue for %s", guild.id)
 
             with open(dir, 'r', encoding='utf8') as f:
@@ -67,11 +70,12 @@ class PlayerCog(Cog):
     async def get_player(self, channel, create=False, *, deserialize=False) -> MusicPlayer:
         guild = channel.guild
 
-        if guild.id in self.players:
+        player = self.players.get(guild.id)
+        if player is not None:
             log.debug('Used cached player')
-            return self.players[guild.id]
+            return player
 
-        async with self.aiolocks[_func_() + ':' + str(guild.id)]:
+        async with self.get_lock(('get_player', guild.id)):
             if deserialize:
                 voice_client = await self.get_voice_client(channel)
                 player = await self.deserialize_queue(guild, voice_client)
@@ -137,7 +141,7 @@ class PlayerCog(Cog):
         else:
             game = Game(type=0, name=self.config.status_message.strip()[:128])
 
-        async with self.aiolocks[_func_()]:
+        async with self.get_lock('update_now_playing_status'):
             if game != self.last_status:
                 await self.bot.change_presence(activity=game)
                 self.last_status = game
@@ -159,12 +163,38 @@ class PlayerCog(Cog):
 
         filepath = path.join(directory, 'queue.json')
 
-        async with self.aiolocks['queue_serialization' + ':' + str(guild.id)]:
+        async with self.get_lock(('queue_serialization', guild.id)):
             log.debug("Serializing queue for %s", guild.id)
 
             with open(filepath, 'w', encoding='utf8') as file:
                 file.write(player.serialize(sort_keys=True))
 
+    def schedule_serialize_queue(self, guild, delay=0.5):
+        """
+        Serialize the queue once no other change has been scheduled for delay
+        seconds, so bursts of changes are written to disk only once.
+        """
+
+        handle = self.serialize_handles.pop(guild.id, None)
+        if handle is not None:
+            handle.cancel()
+
+        self.serialize_handles[guild.id] = self.bot.loop.call_later(
+            delay, self._run_scheduled_serialize, guild
+        )
+
+    def _run_scheduled_serialize(self, guild):
+        del self.serialize_handles[guild.id]
+        task = asyncio.ensure_future(self.serialize_queue(guild))
+        self.serialize_tasks[guild.id] = task
+        task.add_done_callback(lambda task: self._serialize_done(guild.id, task))
+
+    def _serialize_done(self, guild_id, task):
+        if self.serialize_tasks.get(guild_id) is task:
+            del self.serialize_tasks[guild_id]
+        if not task.cancelled() and task.exception() is not None:
+            log.error('Failed to serialize queue for %s', guild_id, exc_info=task.exception())
+
     async def write_current_song(self, guild, entry, *, directory=None):
         """
         Writes the current song to file
@@ -176,7 +206,7 @@ class PlayerCog(Cog):
         if directory is None:
             directory = 'data/%s/current.txt' % guild.id
 
-        async with self.aiolocks['current_song' + ':' + str(guild.id)]:
+        async with self.get_lock(('current_song', guild.id)):
             log.debug("Writing current song for %s", guild.id)
 
             with open(directory, 'w', encoding='utf8') as file:
@@ -199,21 +229,30 @@ class PlayerCog(Cog):
 
         if channel and author:
             author_perms = self.permissions.for_user(author)
+            voice_channel = player.voice_client.channel
 
-            if author not in player.voice_client.channel.members and author_perms.skip_when_absent:
-                newmsg = 'Skipping next song in `%s`: `%s` added by `%s` as queuer not in voice' % (
-                    player.voice_client.channel.name, entry.title, entry.meta['author'].name)
+            if author not in voice_channel.members and author_perms.skip_when_absent:
+                newmsg = (
+                    f'Skipping next song in `{voice_channel.name}`: `{entry.title}` added by'
+                    f' `{author.name}` as queuer not in voice'
+                )
                 player.skip()
             elif self.config.now_playing_mentions:
-                newmsg = '%s - your song `%s` is now playing in `%s`!' % (
-                    entry.meta['author'].mention, entry.title, player.voice_client.channel.name)
+                newmsg = (
+                    f'{author.mention} - your song `{entry.title}` is now playing in'
+                    f' `{voice_channel.name}`!'
+                )
             else:
-                newmsg = 'Now playing in `%s`: `%s` added by `%s`' % (
-                    player.voice_client.channel.name, entry.title, entry.meta['author'].name)
+                newmsg = (
+                    f'Now playing in `{voice_channel.name}`: `{entry.title}` added by'
+                    f' `{author.name}`'
+                )
         else:
             # no author (and channel), it's an autoplaylist (or autostream from my other PR) entry.
-            newmsg = 'Now playing automatically added entry `%s` in `%s`' % (
-                entry.title, player.voice_client.channel.name)
+            newmsg = (
+                f'Now playing automatically added entry `{entry.title}` in'
+                f' `{player.voice_client.channel.name}`'
+            )
 
         if newmsg:
             if self.config.dm_nowplaying and author:
@@ -224,7 +263,7 @@ class PlayerCog(Cog):
                 return
 
             guild = player.voice_client.guild
-            last_np_msg = self.server_specific_data[guild]['last_np_msg']
+            last_np_msg = self.server_specific_data[guild].last_np_msg
 
             if self.config.nowplaying_channels:
                 for potential_channel_id in self.config.nowplaying_channels:
@@ -242,7 +281,7 @@ class PlayerCog(Cog):
                 return
 
             # send it in specified channel
-            self.server_specific_data[guild]['last_np_msg'] = await \
+            self.server_specific_data[guild].last_np_msg = await \
                 self.safe_send_message(channel, newmsg)
 
         # TODO: Check channel voice state?
@@ -264,9 +303,9 @@ class PlayerCog(Cog):
             log.debug("URL \"{}\" not in autoplaylist, ignoring".format(song_url))
             return
 
-        async with self.aiolocks[_func_()]:
+        async with self.get_lock('remove_from_autoplaylist'):
             self.autoplaylist.remove(song_url)
-            log.info("Removing unplayable song from session autoplaylist: %s" % song_url)
+            log.info("Removing unplayable song from session autoplaylist: %s", song_url)
 
             with open(self.config.auto_playlist_removed_file, 'a', encoding='utf8') as file:
                 file.write(
@@ -285,25 +324,21 @@ class PlayerCog(Cog):
 
     @staticmethod
     def _check_if_empty(v_channel: GuildChannel, *, excluding_me=True, excluding_deaf=False):
-        def check(member):
-            member_is_me = excluding_me and member == v_channel.guild.me
-            member_is_deaf = excluding_deaf and any([member.deaf, member.self_deaf])
-            member_is_other_bot = member.bot
-
-            log.debug(
-                'Check if empty %s, %s, %s, %s',
-                member, member_is_me, member_is_deaf, member_is_other_bot
-            )
-
-            return not (member_is_me or member_is_deaf or member_is_other_bot)
-
-        return sum(1 for m in v_channel.members if check(m)) == 0
+        me = v_channel.guild.me if excluding_me else None
+        for member in v_channel.members:
+            if member.bot or member is me:
+                continue
+            if excluding_deaf and (member.voice.deaf or member.voice.self_deaf):
+                continue
+            log.debug('Voice channel %s is not empty, %s is listening', v_channel, member)
+            return False
+        return True
 
     def _autopause(self, player):
         if self._check_if_empty(player.voice_client.channel):
             log.info("Player finished playing, autopaused in empty channel")
             player.pause()
-            self.server_specific_data[player.voice_client.channel.guild]['auto_paused'] = True
+            self.server_specific_data[player.voice_client.channel.guild].auto_paused = True
 
     def _ensure_filled_autoplaylist(self, player):
         if not player.autoplaylist:
@@ -394,17 +429,29 @@ class PlayerCog(Cog):
     async def on_player_entry_added(self, player, playlist, entry, **_):
         log.debug('Running on_player_entry_added')
         if entry.meta.get('author') and entry.meta.get('channel'):
-            await self.serialize_queue(player.voice_client.channel.guild)
+            self.schedule_serialize_queue(player.voice_client.channel.guild)
 
     async def on_player_error(self, player, entry, ex, **_):
         if 'channel' in entry.meta:
-            await self.safe_send_message(
+            self.messenger_cog.enqueue_message(
                 entry.meta['channel'],
                 "```\nError from FFmpeg:\n{}\n```".format(ex)
             )
         else:
             log.exception("Player error", exc_info=ex)
 
-    def remove_player(self, guild):
+    async def remove_player(self, guild):
+        handle = self.serialize_handles.pop(guild.id, None)
+        if handle is not None:
+            handle.cancel()
+            # Write the pending queue changes while the player is still around
+            await self.serialize_queue(guild)
+
+        task = self.serialize_tasks.get(guild.id)
+        if task is not None:
+            # Let a running write finish before the player's queue is cleared,
+            # its errors are logged by _serialize_done
+            await asyncio.wait([task])
+
         if guild.id in self.players:
             self.players.pop(guild.id).kill()
@@ -13,7 +13,7 @@ class SpecialPlayCog(Cog):
         playlist = self.config.weeb_playlist
         if playlist is None or playlist == '':
             raise CommandError('There is no weeb playlist stored')
-        await self._get_cog('PlayCog')._play(context, playlist, shuffle=True)
+        await self.play_cog._play(context, playlist, shuffle=True)
 
     @command(description='Plays weeb playlist')
     async def play_weeb(self, context: Context):
@@ -23,7 +23,7 @@ class SpecialPlayCog(Cog):
         playlist = self.config.normie_playlist
         if playlist is None or playlist == '':
             raise CommandError('There is no normie playlist stored')
-        await self._get_cog('PlayCog')._play(context, playlist, shuffle=True)
+        await self.play_cog._play(context, playlist, shuffle=True)
 
     @command(description='Plays normie playlist')
     async def play_normie(self, context: Context):
@@ -33,4 +33,4 @@ class SpecialPlayCog(Cog):
     async def play_all(self, context: Context):
         await self._play_weeb(context)
         await self._play_normie(context)
-        await self._get_cog('MusicManagerCog').shuffle(context)
+        await self.music_manager_cog.shuffle(context)
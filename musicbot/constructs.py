@@ -1,3 +1,4 @@
+import asyncio
 import json
 import pydoc
 import inspect
@@ -6,6 +7,7 @@ import logging
 import discord
 
 from enum import Enum
+from collections import deque
 from .utils import objdiff, _get_variable
 
 log = logging.getLogger(__name__)
@@ -37,6 +39,47 @@ class SkipState:
         return self.skip_count
 
 
+class ServerState:
+    __slots__ = ['last_np_msg', 'auto_paused', 'availability_paused']
+
+    def __init__(self):
+        self.last_np_msg = None
+        self.auto_paused = False
+        self.availability_paused = False
+
+
+class Ratelimit:
+    __slots__ = ['rate', 'per', '_sent', '_lock']
+
+    # Discord allows 5 messages per 5 seconds on each channel
+    def __init__(self, rate=5, per=5.0):
+        self.rate = rate
+        self.per = per
+        self._sent = deque(maxlen=rate)
+        self._lock = asyncio.Lock()
+
+    @property
+    def idle(self):
+        # Nothing sent during the last period, it's as good as a new one
+        if self._lock.locked():
+            return False
+        return not self._sent or asyncio.get_event_loop().time() - self._sent[-1] >= self.per
+
+    async def __aenter__(self):
+        # The lock is fair so waiters are released in the order they arrived
+        async with self._lock:
+            loop = asyncio.get_event_loop()
+            if len(self._sent) == self.rate:
+                # Wait for the oldest of the last `rate` uses to leave the window
+                delay = self._sent[0] + self.per - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            self._sent.append(loop.time())
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
 class Response:
     __slots__ = ['_content', 'reply', 'delete_after', 'codeblock', '_codeblock']
 
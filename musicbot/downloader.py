@@ -23,6 +23,10 @@ ytdl_format_options = {
     'usenetrc': True
 }
 
+# Seconds during which an info extraction without download is reused
+INFO_CACHE_TTL = 900
+INFO_CACHE_SIZE = 512
+
 # Fuck your useless bugreports message that gets two link embeds and confuses users
 youtube_dl.utils.bug_reports_message = lambda: ''
 
@@ -41,6 +45,7 @@ class Downloader:
         self.safe_ytdl = youtube_dl.YoutubeDL(ytdl_format_options)
         self.safe_ytdl.params['ignoreerrors'] = True
         self.download_folder = download_folder
+        self._info_cache = {}
 
         if download_folder:
             otmpl = self.unsafe_ytdl.params['outtmpl']
@@ -59,11 +64,11 @@ class Downloader:
         """
             Runs ytdl.extract_info within the threadpool. Returns a future that will fire when it's done.
             If `on_error` is passed and an exception is raised, the exception will be caught and passed to
-            on_error as an argument.
+            on_error as an argument. Pass `cache=True` to reuse recent info extractions without download.
         """
         if callable(on_error):
             try:
-                return await loop.run_in_executor(self.thread_pool, functools.partial(self.unsafe_ytdl.extract_info, *args, **kwargs))
+                return await self._run_extract(loop, self.unsafe_ytdl, *args, **kwargs)
 
             except Exception as e:
 
@@ -81,7 +86,49 @@ class Downloader:
                 if retry_on_error:
                     return await self.safe_extract_info(loop, *args, **kwargs)
         else:
-            return await loop.run_in_executor(self.thread_pool, functools.partial(self.unsafe_ytdl.extract_info, *args, **kwargs))
+            return await self._run_extract(loop, self.unsafe_ytdl, *args, **kwargs)
 
     async def safe_extract_info(self, loop, *args, **kwargs):
-        return await loop.run_in_executor(self.thread_pool, functools.partial(self.safe_ytdl.extract_info, *args, **kwargs))
+        return await self._run_extract(loop, self.safe_ytdl, *args, **kwargs)
+
+    async def _run_extract(self, loop, ytdl, *args, cache=False, **kwargs):
+        """
+            Runs ytdl.extract_info within the threadpool. If `cache` is set, extractions that don't
+            download are cached for INFO_CACHE_TTL seconds, and concurrent requests for the same one
+            share a single run.
+        """
+        extract = functools.partial(ytdl.extract_info, *args, **kwargs)
+        if not cache or kwargs.get('download', True):
+            return await loop.run_in_executor(self.thread_pool, extract)
+
+        key = (ytdl is self.safe_ytdl, args, tuple(sorted(kwargs.items())))
+        now = loop.time()
+        cached = self._info_cache.get(key)
+        if cached is not None and cached[0] > now and self._usable(cached[1]):
+            return await asyncio.shield(cached[1])
+
+        future = loop.run_in_executor(self.thread_pool, extract)
+        self._info_cache[key] = (now + INFO_CACHE_TTL, future)
+        try:
+            info = await asyncio.shield(future)
+        except BaseException:
+            # Failed, or this caller was cancelled, don't hand the future to later callers
+            self._forget(key, future)
+            raise
+
+        # Unprocessed playlists may hold their entries in a generator that can only be consumed once
+        if not info or not isinstance(info.get('entries', []), list):
+            self._forget(key, future)
+        elif len(self._info_cache) > INFO_CACHE_SIZE:
+            del self._info_cache[next(iter(self._info_cache))]
+
+        return info
+
+    @staticmethod
+    def _usable(future):
+        return not future.done() or not future.cancelled() and future.exception() is None
+
+    def _forget(self, key, future):
+        cached = self._info_cache.get(key)
+        if cached is not None and cached[1] is future:
+            del self._info_cache[key]
@@ -1,13 +1,33 @@
 import json
 import logging
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 log = logging.getLogger(__name__)
 
+def loads(data):
+    """Parse JSON bytes, str or memoryview, using orjson when it is installed"""
+    if orjson is None:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
+    return orjson.loads(data)
+
+def dumps(obj):
+    """Serialize an object to a JSON string, using orjson when it is installed"""
+    if orjson is None:
+        return json.dumps(obj)
+    return orjson.dumps(obj).decode('utf-8')
+
 class Json:
     def __init__(self, json_file):
         log.debug('Init JSON obj with {0}'.format(json_file))
         self.file = json_file
         self.data = self.parse()
+        self._missing = set()
 
     def parse(self):
         """Parse the file as JSON"""
@@ -21,9 +41,8 @@ class Json:
 
     def get(self, item, fallback=None):
         """Gets an item from a JSON file"""
-        try:
-            data = self.data[item]
-        except KeyError:
-            log.warning('Could not grab data from i18n key {0}.'.format(item, fallback))
-            data = fallback
+        data = self.data.get(item, fallback)
+        if data is fallback and item not in self._missing and item not in self.data:
+            log.warning('Could not grab data from i18n key {0}.'.format(item))
+            self._missing.add(item)
         return data
@@ -69,21 +69,23 @@ class Permissions:
                 traceback.print_exc()
                 raise RuntimeError("Unable to copy config/example_permissions.ini to {}: {}".format(config_file, e))
 
-        self.default_group = PermissionGroup('Default', self.config['Default'])
+        self.default_group = PermissionGroup('Default', self.config['Default'], permissions=self)
         self.groups = set()
+        # Group that lists each user id in its UserList, only for listed users
+        self._user_groups = {}
 
         for section in self.config.sections():
             if section != 'Owner (auto)':
-                self.groups.add(PermissionGroup(section, self.config[section]))
+                self.groups.add(PermissionGroup(section, self.config[section], permissions=self))
                 
         if self.config.has_section('Owner (auto)'):
-            owner_group = PermissionGroup('Owner (auto)', self.config['Owner (auto)'], fallback=Permissive)
+            owner_group = PermissionGroup('Owner (auto)', self.config['Owner (auto)'], fallback=Permissive, permissions=self)
             
         else:
             log.info("[Owner (auto)] section not found, falling back to permissive default")
             # Create a fake section to fallback onto the default permissive values to grant to the owner
             # noinspection PyTypeChecker
-            owner_group = PermissionGroup("Owner (auto)", configparser.SectionProxy(self.config, "Owner (auto)"), fallback=Permissive)
+            owner_group = PermissionGroup("Owner (auto)", configparser.SectionProxy(self.config, "Owner (auto)"), fallback=Permissive, permissions=self)
             
         if hasattr(grant_all, '__iter__'):
             owner_group.user_list = set(grant_all)
@@ -97,6 +99,7 @@ class Permissions:
         if 'auto' in og.user_list:
             log.debug("Fixing automatic owner group")
             og.user_list = {bot.config.owner_id}
+            self.clear_user_groups()
 
     def save(self):
         with open(self.config_file, 'w') as f:
@@ -108,9 +111,9 @@ class Permissions:
         :param user: A discord User or Member object
         """
 
-        for group in self.groups:
-            if user.id in group.user_list:
-                return group
+        group = self._listed_group(user.id)
+        if group is not None:
+            return group
 
         # The only way I could search for roles is if I add a `server=None` param and pass that too
         if type(user) == discord.User:
@@ -124,15 +127,34 @@ class Permissions:
 
         return self.default_group
 
+    def clear_user_groups(self):
+        """
+        Forgets which group lists each user, needed whenever a group's UserList changes
+        """
+        self._user_groups.clear()
+
+    def _listed_group(self, user_id):
+        try:
+            return self._user_groups[user_id]
+        except KeyError:
+            group = next((g for g in self.groups if user_id in g.user_list), None)
+            # Unlisted users aren't cached, otherwise this grows with everyone using the bot
+            if group is not None:
+                self._user_groups[user_id] = group
+            return group
+
     def create_group(self, name, **kwargs):
         self.config.read_dict({name:kwargs})
-        self.groups.add(PermissionGroup(name, self.config[name]))
+        self.groups.add(PermissionGroup(name, self.config[name], permissions=self))
+        self.clear_user_groups()
         # TODO: Test this
 
 
 class PermissionGroup:
-    def __init__(self, name, section_data, fallback=PermissionsDefaults):
+    def __init__(self, name, section_data, fallback=PermissionsDefaults, permissions=None):
         self.name = name
+        # The Permissions owning this group, told about changes to the user list
+        self._permissions = permissions
         
         self.command_whitelist = section_data.get('CommandWhiteList', fallback=fallback.CommandWhiteList)
         self.command_blacklist = section_data.get('CommandBlackList', fallback=fallback.CommandBlackList)
@@ -216,10 +238,14 @@ class PermissionGroup:
 
     def add_user(self, uid):
         self.user_list.add(uid)
+        if self._permissions is not None:
+            self._permissions.clear_user_groups()
 
     def remove_user(self, uid):
         if uid in self.user_list:
             self.user_list.remove(uid)
+            if self._permissions is not None:
+                self._permissions.clear_user_groups()
 
 
     def __repr__(self):
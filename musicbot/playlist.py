@@ -1,4 +1,5 @@
 import os.path
+import asyncio
 import logging
 import datetime
 
@@ -17,6 +18,12 @@ from .exceptions import ExtractionError, WrongEntryTypeError
 
 log = logging.getLogger(__name__)
 
+# Playlist entries whose info is extracted concurrently before queuing them
+PLAYLIST_BATCH_SIZE = 15
+# Attempts, and base seconds between them, when extracting while rate limited
+RATELIMIT_RETRIES = 3
+RATELIMIT_BACKOFF = 2.0
+
 
 class Playlist(EventEmitter, Serializable):
     """
@@ -43,15 +50,15 @@ class Playlist(EventEmitter, Serializable):
         self.entries.clear()
 
     def get_entry_at_index(self, index):
-        self.entries.rotate(-index)
-        entry = self.entries[0]
-        self.entries.rotate(index)
-        return entry
-
-    def delete_entry_at_index(self, index):
-        self.entries.rotate(-index)
-        entry = self.entries.popleft()
-        self.entries.rotate(index)
+        return self.entries[index]
+
+    def pop_entry_at_index(self, index):
+        if index == len(self.entries) - 1:
+            return self.entries.pop()
+        if index == 0:
+            return self.entries.popleft()
+        entry = self.entries[index]
+        del self.entries[index]
         return entry
 
     async def add_entry(self, song_url, info, **meta):
@@ -211,6 +218,59 @@ class Playlist(EventEmitter, Serializable):
 
         return entry_list, position
 
+    async def _extract_entry_info(self, song_url):
+        """
+            Extracts the info of a playlist entry, backing off while the service rate limits us.
+        """
+        for attempt in range(RATELIMIT_RETRIES):
+            try:
+                return await self.downloader.extract_info(self.loop, song_url, download=False)
+
+            except DownloadError as e:
+                cause = e.exc_info[1] if e.exc_info else None
+                cause = getattr(cause, 'cause', None) or cause
+                if getattr(cause, 'code', None) != 429 or attempt == RATELIMIT_RETRIES - 1:
+                    raise
+
+                headers = getattr(cause, 'headers', None) or {}
+                retry_after = headers.get('Retry-After', '')
+                delay = int(retry_after) if retry_after.isdigit() else RATELIMIT_BACKOFF * 2 ** attempt
+                log.debug("Rate limited extracting %s, retrying in %ss", song_url, delay)
+                await asyncio.sleep(delay)
+
+    async def _process_playlist_urls(self, song_urls, meta):
+        """
+            Extracts the info of `song_urls` in concurrent batches and queues them in their order.
+
+            Returns the entries that were added and how many of them could not be.
+        """
+        gooditems = []
+        baditems = 0
+
+        for start in range(0, len(song_urls), PLAYLIST_BATCH_SIZE):
+            batch = song_urls[start:start + PLAYLIST_BATCH_SIZE]
+            infos = await asyncio.gather(
+                *(self._extract_entry_info(song_url) for song_url in batch), return_exceptions=True)
+
+            for song_url, info in zip(batch, infos):
+                if isinstance(info, Exception):
+                    baditems += 1
+                    log.debug("Could not extract information from %s", song_url, exc_info=info)
+                    continue
+
+                try:
+                    entry, elen = await self.add_entry(song_url, info, **meta)
+                    gooditems.append(entry)
+
+                except ExtractionError:
+                    baditems += 1
+
+                except Exception as e:
+                    baditems += 1
+                    log.error("Error adding entry %s", song_url, exc_info=e)
+
+        return gooditems, baditems
+
     async def async_process_youtube_playlist(self, playlist_url, **meta):
         """
             Processes youtube playlists links from `playlist_url` in a questionable, async fashion.
@@ -227,27 +287,19 @@ class Playlist(EventEmitter, Serializable):
         if not info:
             raise ExtractionError('Could not extract information from %s' % playlist_url)
 
-        gooditems = []
+        baseurl = info['webpage_url'].split('playlist?list=')[0]
+        song_urls = []
         baditems = 0
 
         for entry_data in info['entries']:
             if entry_data:
-                baseurl = info['webpage_url'].split('playlist?list=')[0]
-                song_url = baseurl + 'watch?v=%s' % entry_data['id']
-
-                try:
-                    entry, elen = await self.add_entry(song_url, **meta)
-                    gooditems.append(entry)
-
-                except ExtractionError:
-                    baditems += 1
-
-                except Exception as e:
-                    baditems += 1
-                    log.error("Error adding entry {}".format(entry_data['id']), exc_info=e)
+                song_urls.append(baseurl + 'watch?v=%s' % entry_data['id'])
             else:
                 baditems += 1
 
+        gooditems, failed = await self._process_playlist_urls(song_urls, meta)
+        baditems += failed
+
         if baditems:
             log.info("Skipped {} bad entries".format(baditems))
 
@@ -269,26 +321,18 @@ class Playlist(EventEmitter, Serializable):
         if not info:
             raise ExtractionError('Could not extract information from %s' % playlist_url)
 
-        gooditems = []
+        song_urls = []
         baditems = 0
 
         for entry_data in info['entries']:
             if entry_data:
-                song_url = entry_data['url']
-
-                try:
-                    entry, elen = await self.add_entry(song_url, **meta)
-                    gooditems.append(entry)
-
-                except ExtractionError:
-                    baditems += 1
-
-                except Exception as e:
-                    baditems += 1
-                    log.error("Error adding entry {}".format(entry_data['id']), exc_info=e)
+                song_urls.append(entry_data['url'])
             else:
                 baditems += 1
 
+        gooditems, failed = await self._process_playlist_urls(song_urls, meta)
+        baditems += failed
+
         if baditems:
             log.info("Skipped {} bad entries".format(baditems))
 
@@ -308,6 +352,20 @@ class Playlist(EventEmitter, Serializable):
     def remove_entry(self, index):
         del self.entries[index]
 
+    def discard_entries(self, entries):
+        """
+            Removes the given entries from the queue in a single pass, returns the ones that were
+            actually queued.
+        """
+        discarded = {id(entry) for entry in entries}
+        kept, removed = [], []
+        for entry in self.entries:
+            (removed if id(entry) in discarded else kept).append(entry)
+
+        self.entries.clear()
+        self.entries.extend(kept)
+        return removed
+
     async def get_next_entry(self, predownload_next=True):
         """
             A coroutine which will return the next song or None if no songs left to play.
@@ -5,6 +5,7 @@ import logging
 import time
 
 from .exceptions import SpotifyError
+from .json import loads
 
 log = logging.getLogger(__name__)
 
@@ -51,15 +52,15 @@ class Spotify:
         """Makes a GET request and returns the results"""
         async with self.aiosession.get(url, headers=headers) as r:
             if r.status != 200:
-                raise SpotifyError('Issue making GET request to {0}: [{1.status}] {2}'.format(url, r, await r.json()))
-            return await r.json()
+                raise SpotifyError('Issue making GET request to {0}: [{1.status}] {2}'.format(url, r, await r.json(loads=loads)))
+            return await r.json(loads=loads)
 
     async def make_post(self, url, payload, headers=None):
         """Makes a POST request and returns the results"""
         async with self.aiosession.post(url, data=payload, headers=headers) as r:
             if r.status != 200:
-                raise SpotifyError('Issue making POST request to {0}: [{1.status}] {2}'.format(url, r, await r.json()))
-            return await r.json()
+                raise SpotifyError('Issue making POST request to {0}: [{1.status}] {2}'.format(url, r, await r.json(loads=loads)))
+            return await r.json(loads=loads)
 
     async def get_token(self):
         """Gets the token or creates a new one if expired"""
@@ -1,3 +1,4 @@
+from functools import lru_cache
 from hashlib import md5
 import inspect
 import logging
@@ -13,19 +14,18 @@ log = logging.getLogger(__name__)
 def load_file(filename, skip_commented_lines=True, comment_char='#'):
     try:
         with open(filename, encoding='utf8') as f:
-            results = []
-            for line in f:
-                line = line.strip()
-
-                if line and not (skip_commented_lines and line.startswith(comment_char)):
-                    results.append(line)
-
-            return results
+            lines = f.read().splitlines()
 
     except IOError as e:
         print("Error loading", filename, e)
         return []
 
+    stripped = (line.strip() for line in lines)
+    return [
+        line for line in stripped
+        if line and not (skip_commented_lines and line.startswith(comment_char))
+    ]
+
 
 def write_file(filename, contents):
     with open(filename, 'w', encoding='utf8') as f:
@@ -85,6 +85,21 @@ def ftimedelta(td):
     return ':'.join([p1, '{:02d}'.format(int(float(p2)))])
 
 
+def fseconds(secs):
+    return _fseconds(int(secs))
+
+
+@lru_cache(maxsize=512)
+def _fseconds(secs):
+    minutes, seconds = divmod(secs, 60)
+    hours, minutes = divmod(minutes, 60)
+    days, hours = divmod(hours, 24)
+    clock = '{}:{:02d}:{:02d}'.format(hours, minutes, seconds)
+    if days:
+        return '{} day{}, {}'.format(days, '' if days == 1 else 's', clock)
+    return clock
+
+
 def safe_print(content, *, end='\n', flush=True):
     sys.stdout.buffer.write((content + end).encode('utf-8', 'replace'))
     if flush: sys.stdout.flush()